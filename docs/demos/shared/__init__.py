@@ -33,6 +33,7 @@ from .lib import (
     record_snapshot,
     # External dependencies
     ensure_vhs_binary,
+    ensure_all_deps,
 )
 from .themes import THEMES, format_theme_for_vhs
 
@@ -71,4 +72,5 @@ __all__ = [
     "record_snapshot",
     # External dependencies
     "ensure_vhs_binary",
+    "ensure_all_deps",
 ]
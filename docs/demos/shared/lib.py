@@ -1,12 +1,17 @@
 """Shared infrastructure for demo recording scripts."""
 
+import functools
+import hashlib
 import json
 import os
 import platform
 import re
+import shlex
 import shutil
 import subprocess
+import tempfile
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -24,6 +29,7 @@ _VHS_FORK_REPO = "https://github.com/max-sixty/vhs.git"
 _VHS_FORK_BRANCH = "keypress-overlay"
 
 
+@functools.lru_cache(maxsize=1)
 def _detect_platform() -> str:
     """Detect platform for Claude Code binary download."""
     system = platform.system().lower()
@@ -43,8 +49,14 @@ def _detect_platform() -> str:
     else:
         raise RuntimeError(f"Unsupported architecture: {machine}")
 
-    # Check for musl on Linux x64
+    # Check for musl on Linux x64. libc_ver() settles it without a subprocess.
+    # Only when it's inconclusive do the musl loader path and then ldd decide:
+    # glibc hosts can have /lib/ld-musl-* too (Debian's musl package).
     if os_name == "linux" and arch == "x64":
+        if platform.libc_ver()[0] == "glibc":
+            return "linux-x64"
+        if any(Path("/lib").glob("ld-musl-*")):
+            return "linux-x64-musl"
         try:
             result = subprocess.run(
                 ["ldd", "--version"], capture_output=True, text=True, check=False
@@ -57,24 +69,54 @@ def _detect_platform() -> str:
     return f"{os_name}-{arch}"
 
 
-def _download_file(url: str, dest: Path) -> None:
+def _download_file(url: str, dest: Path, sha256: str = None) -> None:
     """Download a file from URL to destination (parallel-safe).
 
-    Uses PID-unique temp file to avoid races when multiple processes download
-    simultaneously. Only moves to dest if dest doesn't exist at move time.
+    Each writer gets a unique temp file next to dest (so concurrent threads or
+    processes never share one, and the final rename stays atomic). Only moves
+    to dest if dest doesn't exist at move time.
+
+    If sha256 is given, the bytes are hashed as they're written and the
+    download is rejected on mismatch, before it's moved into place.
     """
     dest.parent.mkdir(parents=True, exist_ok=True)
     print(f"Downloading {dest.name}...")
-    temp = dest.with_suffix(f".{os.getpid()}.tmp")
+    fd, temp_name = tempfile.mkstemp(dir=dest.parent, prefix=f"{dest.name}.", suffix=".tmp")
+    temp = Path(temp_name)
+    digest = hashlib.sha256()
+    # Read straight into one reused 1 MiB buffer (writes that size bypass the
+    # file's own buffer), so each chunk is copied once
+    buf = memoryview(bytearray(1 << 20))
     try:
-        urllib.request.urlretrieve(url, temp)
-        # Only move if dest doesn't exist (another process may have finished first)
+        with os.fdopen(fd, "wb") as f, urllib.request.urlopen(url, timeout=60) as resp:
+            while n := resp.readinto(buf):
+                digest.update(buf[:n])
+                f.write(buf[:n])
+        if sha256 and digest.hexdigest() != sha256:
+            raise RuntimeError(
+                f"Checksum mismatch for {dest.name}: expected {sha256}, got {digest.hexdigest()}"
+            )
+        temp.chmod(0o644)  # mkstemp creates 0600
+        # Only move if dest doesn't exist (another writer may have finished first)
         if not dest.exists():
             temp.rename(dest)
     finally:
         temp.unlink(missing_ok=True)
 
 
+def _link_or_copy(src: Path, dest: Path) -> None:
+    """Hard-link src to dest, falling back to a copy across filesystems.
+
+    Only for cached downloads (the Claude binary, the Zellij plugin), never
+    tracked fixtures, since a hard link shares its contents with the original.
+    """
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy(src, dest)
+
+
 def _ensure_claude_binary() -> Path:
     """Ensure Claude Code binary is downloaded, return path."""
     claude_binary = DEPS_DIR / "claude"
@@ -85,22 +127,31 @@ def _ensure_claude_binary() -> Path:
     print(f"Fetching Claude Code for {plat}...")
 
     # Get stable version
-    with urllib.request.urlopen(f"{_GCS_BUCKET}/stable") as resp:
+    with urllib.request.urlopen(f"{_GCS_BUCKET}/stable", timeout=60) as resp:
         version = resp.read().decode().strip()
     print(f"Claude Code version: {version}")
 
+    # Pinned checksum from the release manifest (what the official installer verifies)
+    try:
+        with urllib.request.urlopen(f"{_GCS_BUCKET}/{version}/manifest.json", timeout=60) as resp:
+            manifest = json.load(resp)
+        checksum = manifest["platforms"][plat]["checksum"]
+    except (OSError, KeyError, ValueError):
+        checksum = None
+
     # Download binary
-    _download_file(f"{_GCS_BUCKET}/{version}/{plat}/claude", claude_binary)
+    _download_file(f"{_GCS_BUCKET}/{version}/{plat}/claude", claude_binary, sha256=checksum)
     claude_binary.chmod(0o755)
 
-    # Verify
-    result = subprocess.run(
-        [str(claude_binary), "--version"], capture_output=True, text=True, check=False
-    )
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"Claude binary downloaded but --version failed: {result.stderr or result.stdout}"
+    # Verify by running it, unless the checksum already did
+    if checksum is None:
+        result = subprocess.run(
+            [str(claude_binary), "--version"], capture_output=True, text=True, check=False
         )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"Claude binary downloaded but --version failed: {result.stderr or result.stdout}"
+            )
 
     print(f"✓ Claude Code {version} ready")
     return claude_binary
@@ -140,7 +191,10 @@ def ensure_vhs_binary() -> Path:
         print(f"Cloning VHS fork...")
         DEPS_DIR.mkdir(parents=True, exist_ok=True)
         result = subprocess.run(
-            ["git", "clone", "-b", _VHS_FORK_BRANCH, "--depth=1", _VHS_FORK_REPO, str(vhs_dir)],
+            [
+                "git", "clone", "-b", _VHS_FORK_BRANCH, "--depth=1", "--single-branch",
+                _VHS_FORK_REPO, str(vhs_dir),
+            ],
             capture_output=True,
             text=True,
         )
@@ -172,6 +226,25 @@ def ensure_vhs_binary() -> Path:
     return vhs_binary
 
 
+def ensure_all_deps(claude: bool = True, zellij_plugin: bool = True) -> None:
+    """Ensure external dependencies are present, fetching them concurrently.
+
+    The Claude binary, Zellij plugin, and VHS build are independent, so on a
+    cold `.deps/` the wall clock is the slowest one rather than the sum. VHS
+    is always ensured; pass claude/zellij_plugin=False to leave those to the
+    lazy fetch in setup_claude_code_config/setup_zellij_config.
+    """
+    ensures = [ensure_vhs_binary]
+    if claude:
+        ensures.append(_ensure_claude_binary)
+    if zellij_plugin:
+        ensures.append(_ensure_zellij_plugin)
+    with ThreadPoolExecutor(max_workers=len(ensures)) as executor:
+        futures = [executor.submit(ensure) for ensure in ensures]
+        for future in futures:
+            future.result()
+
+
 # Shared content for demos
 VALIDATION_RS = """//! Input validation utilities.
 
@@ -206,6 +279,8 @@ class DemoEnv:
     name: str
     out_dir: Path
     repo_name: str = "worktrunk"
+    # "Now" for the demo's seeded commit dates, set by prepare_base_repo
+    date_baseline: datetime = None
 
     @property
     def root(self) -> Path:
@@ -227,13 +302,30 @@ class DemoEnv:
     def bare_remote(self) -> Path:
         return self.root / "remote.git"
 
+    # Resolved (symlink-free) paths, as embedded in tapes and snapshots
+    @functools.cached_property
+    def out_dir_resolved(self) -> Path:
+        return self.out_dir.resolve()
+
+    @functools.cached_property
+    def home_resolved(self) -> Path:
+        return self.home.resolve()
+
+    @functools.cached_property
+    def repo_resolved(self) -> Path:
+        return self.repo.resolve()
+
 
 def run(cmd, cwd=None, env=None, check=True, capture=False):
-    """Run a command."""
+    """Run a command, returning its stdout when capture=True."""
+    if not capture:
+        # Inherit stdio: no pipes, no decoding
+        subprocess.run(cmd, cwd=cwd, env=env, check=check)
+        return None
     result = subprocess.run(
-        cmd, cwd=cwd, env=env, check=check, capture_output=capture, text=True
+        cmd, cwd=cwd, env=env, check=check, capture_output=True, text=True
     )
-    return result.stdout if capture else None
+    return result.stdout
 
 
 def git(args, cwd=None, env=None):
@@ -241,6 +333,37 @@ def git(args, cwd=None, env=None):
     run(["git"] + args, cwd=cwd, env=env)
 
 
+def git_batch(repo: Path, commands: list[list[str]], env=None):
+    """Run several git commands in repo from one shell, stopping at the first failure."""
+    script = " && ".join(shlex.join(["git", *args]) for args in commands)
+    run(["sh", "-c", script], cwd=repo, env=env)
+
+
+_SOURCE_RE = re.compile(r"^Source\s+(.+)$", re.MULTILINE)
+_TEMPLATE_VAR_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+@functools.lru_cache(maxsize=None)
+def _read_source(path: Path) -> str:
+    """Read a Source'd tape (shared tapes are inlined into every render)."""
+    return path.read_text()
+
+
+@functools.lru_cache(maxsize=None)
+def _inline_sources(template_path: Path, repo_root: Path) -> str:
+    """Read a tape template with its Source directives inlined.
+
+    The result only depends on the files, so it is shared by every render of
+    the same template (one per theme, plus text and snapshot recording).
+    """
+
+    # VHS doesn't support Source directives, we handle it
+    def inline_source(match):
+        return _read_source(repo_root / match.group(1).strip().strip('"'))
+
+    return _SOURCE_RE.sub(inline_source, template_path.read_text())
+
+
 def render_tape(template_path: Path, replacements: dict, repo_root: Path) -> str | None:
     """Render a VHS tape template with Source inlining and variable substitutions.
 
@@ -256,19 +379,14 @@ def render_tape(template_path: Path, replacements: dict, repo_root: Path) -> str
         print(f"Warning: {template_path} not found, skipping VHS recording")
         return None
 
-    rendered = template_path.read_text()
-
-    # Inline Source directives (VHS doesn't support them, we handle it)
-    def inline_source(match):
-        source_path = repo_root / match.group(1).strip().strip('"')
-        return source_path.read_text()
+    rendered = _inline_sources(template_path, repo_root)
 
-    rendered = re.sub(r"^Source\s+(.+)$", inline_source, rendered, flags=re.MULTILINE)
+    # Apply template variable replacements in one pass (unknown {{VAR}}s are kept)
+    def substitute(match):
+        value = replacements.get(match.group(1))
+        return match.group(0) if value is None else str(value)
 
-    # Apply template variable replacements
-    for key, value in replacements.items():
-        rendered = rendered.replace(f"{{{{{key}}}}}", str(value))
-    return rendered
+    return _TEMPLATE_VAR_RE.sub(substitute, rendered)
 
 
 def record_vhs(
@@ -284,39 +402,146 @@ def record_vhs(
         )
 
 
+@functools.lru_cache(maxsize=None)
 def build_wt(repo_root: Path):
-    """Build the wt binary."""
+    """Build the wt binary.
+
+    Runs once per process: later demos in the same run reuse the result
+    rather than queueing on cargo's build lock again. Whether anything needs
+    rebuilding is left to cargo's own fingerprinting.
+    """
     print("Building wt binary...")
     run(["cargo", "build", "--quiet"], cwd=repo_root)
 
 
-def commit_dated(repo: Path, message: str, offset: str, env_extra: dict = None):
-    """Commit with a date offset like '7d' or '2H'."""
-    now = datetime.now()
-    if offset.endswith("d"):
-        delta = timedelta(days=int(offset[:-1]))
-    elif offset.endswith("H"):
-        delta = timedelta(hours=int(offset[:-1]))
-    else:
+_OFFSET_RE = re.compile(r"(\d+)([dH])")
+_OFFSET_UNITS = {"d": "days", "H": "hours"}
+
+
+def _commit_time(offset: str, now: datetime) -> datetime:
+    """Commit time for a date offset like '7d' or '2H' before now."""
+    match = _OFFSET_RE.fullmatch(offset)
+    if not match:
         raise ValueError(f"Unknown offset format: {offset}")
+    amount, unit = match.groups()
+    return now - timedelta(**{_OFFSET_UNITS[unit]: int(amount)})
 
-    date_str = (now - delta).strftime("%Y-%m-%dT%H:%M:%S")
-    env = os.environ.copy()
-    env["GIT_AUTHOR_DATE"] = date_str
-    env["GIT_COMMITTER_DATE"] = date_str
-    env["SKIP_DEMO_HOOK"] = "1"
-    if env_extra:
-        env.update(env_extra)
+
+def commit_dated(
+    repo: Path, message: str, offset: str, env_extra: dict = None, now: datetime = None
+):
+    """Commit with a date offset like '7d' or '2H' (before now, default: the current time)."""
+    when = _commit_time(offset, now or datetime.now().astimezone())
+    date_str = when.isoformat(timespec="seconds")
+    env = {
+        **os.environ,
+        "GIT_AUTHOR_DATE": date_str,
+        "GIT_COMMITTER_DATE": date_str,
+        "SKIP_DEMO_HOOK": "1",
+        **(env_extra or {}),
+    }
     git(["-C", str(repo), "commit", "-qm", message], env=env)
 
 
+_DEMO_IDENT = "Worktrunk Demo <demo@example.com>"
+
+
+def _fast_import(
+    repo: Path,
+    branch: str,
+    commits: list[tuple[str, str, dict[str, str]]],
+    now: datetime,
+    parent: str = None,
+):
+    """Write a run of dated commits onto a branch with one `git fast-import`.
+
+    Each commit is (message, offset, {path: content}); the files are added or
+    replaced on top of the previous commit's tree. Only objects and the branch
+    ref are written — the index and working tree are left untouched.
+
+    Args:
+        repo: Repository to import into
+        branch: Branch to create or advance
+        commits: Commits in order, oldest first
+        now: Time the commit date offsets count back from
+        parent: Commit-ish to build on (default: none, so the first commit is a root)
+    """
+    stream = bytearray()
+    for i, (message, offset, files) in enumerate(commits):
+        when = _commit_time(offset, now)
+        stamp = f"{int(when.timestamp())} {when.strftime('%z')}"
+        msg = f"{message}\n".encode()
+        stream += f"commit refs/heads/{branch}\n".encode()
+        stream += f"author {_DEMO_IDENT} {stamp}\ncommitter {_DEMO_IDENT} {stamp}\n".encode()
+        stream += f"data {len(msg)}\n".encode() + msg
+        if i == 0 and parent:
+            stream += f"from {parent}^0\n".encode()
+        for path, content in files.items():
+            data = content.encode()
+            stream += f"M 100644 inline {path}\ndata {len(data)}\n".encode() + data + b"\n"
+        stream += b"\n"
+    subprocess.run(
+        ["git", "fast-import", "--quiet", "--date-format=raw"],
+        cwd=repo,
+        input=bytes(stream),
+        check=True,
+    )
+
+
+_BAT_WRAPPER_SCRIPT = b"""#!/bin/bash
+# Use bat for syntax highlighting if file is toml
+if [[ "$1" == *.toml ]]; then
+    exec bat --style=plain --paging=never "$@"
+else
+    exec /bin/cat "$@"
+fi
+"""
+
+
+# Fish syntax highlighting colors, written by prepare_base_repo
+_FISH_COLOR_VARS = {
+    "fish_color_autosuggestion": "brblack",
+    "fish_color_command": "yellow",  # amber — matches website .cmd color
+    "fish_color_comment": "brblack",
+    "fish_color_end": "normal",
+    "fish_color_error": "red",
+    "fish_color_escape": "cyan",
+    "fish_color_keyword": "yellow",
+    "fish_color_normal": "normal",
+    "fish_color_operator": "normal",
+    "fish_color_param": "normal",
+    "fish_color_quote": "green",
+    "fish_color_redirection": "normal",
+}
+_FISH_VARIABLES = "".join(
+    f"{line}\n"
+    for line in [
+        "# This file contains fish universal variable definitions.",
+        "# VERSION: 3.0",
+        *(f"SETUVAR {k}:{v}" for k, v in _FISH_COLOR_VARS.items()),
+        "SETUVAR fish_color_cancel:\\x2d\\x2dreverse",
+        "SETUVAR fish_color_search_match:\\x2d\\x2dbackground\\x3d111",
+        "SETUVAR fish_color_selection:\\x2d\\x2dbackground\\x3dbrblack",
+        "SETUVAR fish_color_valid_path:\\x2d\\x2dunderline",
+        "SETUVAR fish_greeting:",
+    ]
+).encode()
+_COLORS_FISH = "".join(f"set -g {k} {v}\n" for k, v in _FISH_COLOR_VARS.items()).encode()
+
+
+def _write_executable(path: Path, script: bytes) -> None:
+    """Write a script that is created executable, so no separate chmod."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
+    with os.fdopen(fd, "wb") as f:
+        f.write(script)
+
+
 def prepare_base_repo(env: DemoEnv, repo_root: Path):
     """Set up the base demo repository with Rust project.
 
     Creates:
     - Git repo with initial commit
     - Rust project (Cargo.toml, lib.rs, Cargo.lock)
-    - Mock gh CLI for CI status
     - bat wrapper for syntax highlighting
     - User config directory
 
@@ -330,6 +555,10 @@ def prepare_base_repo(env: DemoEnv, repo_root: Path):
     # e.g., stale processes holding files open)
     shutil.rmtree(env.root, ignore_errors=True)
 
+    # Seeded commit ages are relative to when this demo is set up, so they
+    # read the same however late in a long build it's recorded
+    env.date_baseline = datetime.now().astimezone()
+
     env.root.mkdir(parents=True, exist_ok=True)
     env.work_base.mkdir(parents=True, exist_ok=True)
     env.repo.mkdir(parents=True, exist_ok=True)
@@ -338,53 +567,64 @@ def prepare_base_repo(env: DemoEnv, repo_root: Path):
     run(["git", "init", "--bare", "-q", str(env.bare_remote)])
 
     # Init main repo
-    git(["-C", str(env.repo), "init", "-q"])
-    git(["-C", str(env.repo), "config", "user.name", "Worktrunk Demo"])
-    git(["-C", str(env.repo), "config", "user.email", "demo@example.com"])
-    git(["-C", str(env.repo), "config", "commit.gpgsign", "false"])
-    # Suppress wt hints in demo output (hints are stored in git config)
-    git(["-C", str(env.repo), "config", "worktrunk.hints.worktree-path", "true"])
-
-    # Initial commit
-    (env.repo / "README.md").write_text("# Acme App\n\nA demo application.\n")
-    git(["-C", str(env.repo), "add", "README.md"])
-    commit_dated(env.repo, "Initial commit", "7d")
-    git(["-C", str(env.repo), "branch", "-m", "main"])
-    # Use local bare repo as remote (GitHub URLs cause VHS to hang waiting for SSH)
-    git(["-C", str(env.repo), "remote", "add", "origin", str(env.bare_remote)])
-    git(["-C", str(env.repo), "push", "-u", "origin", "main", "-q"])
+    git_batch(
+        env.repo,
+        [
+            ["init", "-q", "-b", "main"],
+            ["config", "user.name", "Worktrunk Demo"],
+            ["config", "user.email", "demo@example.com"],
+            ["config", "commit.gpgsign", "false"],
+            # Suppress wt hints in demo output (hints are stored in git config)
+            ["config", "worktrunk.hints.worktree-path", "true"],
+        ],
+    )
 
     # Rust project
-    (env.repo / "Cargo.toml").write_text(
-        '[package]\nname = "acme"\nversion = "0.1.0"\nedition = "2021"\n\n[workspace]\n'
-    )
+    readme = "# Acme App\n\nA demo application.\n"
+    gitignore = "/target\n"
+    cargo_toml = '[package]\nname = "acme"\nversion = "0.1.0"\nedition = "2021"\n\n[workspace]\n'
+    lib_rs = (FIXTURES_DIR / "lib.rs").read_text()
+    (env.repo / "README.md").write_text(readme)
+    (env.repo / ".gitignore").write_text(gitignore)
+    (env.repo / "Cargo.toml").write_text(cargo_toml)
     (env.repo / "src").mkdir()
-    shutil.copy(FIXTURES_DIR / "lib.rs", env.repo / "src" / "lib.rs")
-    (env.repo / ".gitignore").write_text("/target\n")
-    git(["-C", str(env.repo), "add", ".gitignore", "Cargo.toml", "src/"])
-    commit_dated(env.repo, "Add Rust project with tests", "6d")
-
-    # Build to create Cargo.lock
-    run(["cargo", "build", "--release", "-q"], cwd=env.repo, check=False)
-    git(["-C", str(env.repo), "add", "Cargo.lock"])
-    commit_dated(env.repo, "Add Cargo.lock", "6d")
-    git(["-C", str(env.repo), "push", "-q"])
+    (env.repo / "src" / "lib.rs").write_text(lib_rs)
+
+    # Create Cargo.lock (no compile needed: the lockfile is all we commit)
+    run(["cargo", "generate-lockfile", "-q"], cwd=env.repo, check=False)
+
+    # Seed the history in one process, then point the index at it (not -q:
+    # the quiet form skips the index refresh)
+    _fast_import(
+        env.repo,
+        "main",
+        [
+            ("Initial commit", "7d", {"README.md": readme}),
+            (
+                "Add Rust project with tests",
+                "6d",
+                {".gitignore": gitignore, "Cargo.toml": cargo_toml, "src/lib.rs": lib_rs},
+            ),
+            ("Add Cargo.lock", "6d", {"Cargo.lock": (env.repo / "Cargo.lock").read_text()}),
+        ],
+        now=env.date_baseline,
+    )
+    git_batch(
+        env.repo,
+        [
+            ["reset"],
+            # Use local bare repo as remote (GitHub URLs cause VHS to hang waiting for SSH)
+            ["remote", "add", "origin", str(env.bare_remote)],
+            ["push", "-u", "origin", "main", "-q"],
+        ],
+    )
 
     # Mock CLI tools
     bin_dir = env.home / ".local" / "bin"
     bin_dir.mkdir(parents=True, exist_ok=True)
 
     # bat wrapper for syntax highlighting (alias cat to bat for toml files)
-    bat_wrapper = bin_dir / "cat"
-    bat_wrapper.write_text("""#!/bin/bash
-# Use bat for syntax highlighting if file is toml
-if [[ "$1" == *.toml ]]; then
-    exec bat --style=plain --paging=never "$@"
-else
-    exec /bin/cat "$@"
-fi
-""")
-    bat_wrapper.chmod(0o755)
+    _write_executable(bin_dir / "cat", _BAT_WRAPPER_SCRIPT)
 
     # Build wt binary
     build_wt(repo_root)
@@ -393,8 +633,7 @@ fi
     # Note: Demos using tab completion also need to source the completions
     # in the tape's hidden section (VHS doesn't trigger fish's lazy loading)
     wt_bin = repo_root / "target" / "debug" / "wt"
-    install_env = os.environ.copy()
-    install_env["HOME"] = str(env.home)
+    install_env = {**os.environ, "HOME": str(env.home)}
     run([str(wt_bin), "config", "shell", "install", "fish", "--yes"], env=install_env)
 
     # Fish syntax highlighting colors — use ANSI names so the VHS terminal
@@ -404,39 +643,11 @@ fi
     # starts, so fish_variables from the demo home isn't read).
     fish_config_dir = env.home / ".config" / "fish"
     fish_config_dir.mkdir(parents=True, exist_ok=True)
-    color_vars = {
-        "fish_color_autosuggestion": "brblack",
-        "fish_color_command": "yellow",  # amber — matches website .cmd color
-        "fish_color_comment": "brblack",
-        "fish_color_end": "normal",
-        "fish_color_error": "red",
-        "fish_color_escape": "cyan",
-        "fish_color_keyword": "yellow",
-        "fish_color_normal": "normal",
-        "fish_color_operator": "normal",
-        "fish_color_param": "normal",
-        "fish_color_quote": "green",
-        "fish_color_redirection": "normal",
-    }
 
     # fish_variables file (for --shell and --snapshot modes)
-    lines = [
-        "# This file contains fish universal variable definitions.",
-        "# VERSION: 3.0",
-    ]
-    lines.extend(f"SETUVAR {k}:{v}" for k, v in color_vars.items())
-    lines.extend([
-        "SETUVAR fish_color_cancel:\\x2d\\x2dreverse",
-        "SETUVAR fish_color_search_match:\\x2d\\x2dbackground\\x3d111",
-        "SETUVAR fish_color_selection:\\x2d\\x2dbackground\\x3dbrblack",
-        "SETUVAR fish_color_valid_path:\\x2d\\x2dunderline",
-        "SETUVAR fish_greeting:",
-    ])
-    (fish_config_dir / "fish_variables").write_text("\n".join(lines) + "\n")
-
+    (fish_config_dir / "fish_variables").write_bytes(_FISH_VARIABLES)
     # colors.fish script (sourced in VHS tape hidden section)
-    color_lines = [f"set -g {k} {v}" for k, v in color_vars.items()]
-    (fish_config_dir / "colors.fish").write_text("\n".join(color_lines) + "\n")
+    (fish_config_dir / "colors.fish").write_bytes(_COLORS_FISH)
 
     # User config directory (demos add their own config.toml)
     config_dir = env.home / ".config" / "worktrunk"
@@ -446,6 +657,65 @@ fi
     (env.repo / ".config").mkdir(exist_ok=True)
 
 
+# Static .claude.json keys that skip Claude Code's first-run dialogs and tips,
+# split around the per-demo customApiKeyResponses to keep the file's key order
+_CLAUDE_JSON_DEFAULTS = {
+    "numStartups": 100,
+    "installMethod": "global",
+    "theme": "light",
+    "firstStartTime": "2025-01-01T00:00:00.000Z",
+    "hasCompletedOnboarding": True,
+    "hasCompletedClaudeInChromeOnboarding": True,
+    "claudeInChromeDefaultEnabled": False,
+    "sonnet45MigrationComplete": True,
+    "opus45MigrationComplete": True,
+    "thinkingMigrationComplete": True,
+    "hasShownOpus45Notice": {},
+    "hasShownOpus46Notice": {},
+    "opusProMigrationComplete": True,
+    "opus46FeedSeenCount": 100,
+    "sonnet1m45MigrationComplete": True,
+    "lastReleaseNotesSeen": "99.0.0",
+    "lastOnboardingVersion": "99.0.0",
+    "oauthAccount": {
+        "displayName": "wt",
+        "emailAddress": "demo@example.com",
+    },
+}
+_CLAUDE_JSON_TIPS_DEFAULTS = {
+    "officialMarketplaceAutoInstalled": True,
+    "effortCalloutDismissed": True,
+    "lspRecommendationDisabled": True,
+    "tipsHistory": {
+        "new-user-warmup": 100,
+        "terminal-setup": 100,
+        "theme-command": 100,
+        "fast-mode-2026-02-01": 100,
+        "adaptive-thinking-2026-01-28": 100,
+        "prompt-caching-scope-2026-01-05": 100,
+        "plan-mode-for-complex-tasks": 100,
+        "memory-command": 100,
+        "todo-list": 100,
+        "stickers-command": 100,
+        "status-line": 100,
+        "custom-commands": 100,
+        "custom-agents": 100,
+        "permissions": 100,
+        "git-worktrees": 100,
+    },
+}
+
+
+# Claude settings.json apart from the per-demo permissions
+_CLAUDE_SETTINGS_DEFAULTS = {
+    "model": "claude-opus-4-6",
+    "statusLine": {
+        "type": "command",
+        "command": "wt list statusline --format=claude-code",
+    },
+}
+
+
 def setup_claude_code_config(
     env: DemoEnv,
     worktree_paths: list[str],
@@ -458,17 +728,18 @@ def setup_claude_code_config(
         worktree_paths: List of worktree paths to pre-approve for trust
         allowed_tools: List of tools to pre-approve (default: none, Claude will ask)
     """
-    api_key_suffix = (
-        os.environ.get("ANTHROPIC_API_KEY", "")[-20:]
-        if os.environ.get("ANTHROPIC_API_KEY")
-        else ""
-    )
+    api_key_suffix = os.environ.get("ANTHROPIC_API_KEY", "")[-20:]
 
     # Build projects config - pre-approve trust for all worktree paths
-    # Use resolved paths to handle macOS symlinks (/var -> /private/var)
+    # Use resolved paths to handle macOS symlinks (/var -> /private/var).
+    # Worktrees live under work_base, so resolve that once and join.
+    work_base = env.work_base.resolve()
     projects_config = {}
-    for path in worktree_paths:
-        resolved_path = str(Path(path).resolve())
+    for path in map(Path, worktree_paths):
+        if path.is_relative_to(env.work_base):
+            resolved_path = str(work_base / path.relative_to(env.work_base))
+        else:
+            resolved_path = str(path.resolve())
         projects_config[resolved_path] = {
             "allowedTools": [],
             "hasTrustDialogAccepted": True,
@@ -478,78 +749,86 @@ def setup_claude_code_config(
     claude_json.write_text(
         json.dumps(
             {
-                "numStartups": 100,
-                "installMethod": "global",
-                "theme": "light",
-                "firstStartTime": "2025-01-01T00:00:00.000Z",
-                "hasCompletedOnboarding": True,
-                "hasCompletedClaudeInChromeOnboarding": True,
-                "claudeInChromeDefaultEnabled": False,
-                "sonnet45MigrationComplete": True,
-                "opus45MigrationComplete": True,
-                "thinkingMigrationComplete": True,
-                "hasShownOpus45Notice": {},
-                "hasShownOpus46Notice": {},
-                "opusProMigrationComplete": True,
-                "opus46FeedSeenCount": 100,
-                "sonnet1m45MigrationComplete": True,
-                "lastReleaseNotesSeen": "99.0.0",
-                "lastOnboardingVersion": "99.0.0",
-                "oauthAccount": {
-                    "displayName": "wt",
-                    "emailAddress": "demo@example.com",
-                },
+                **_CLAUDE_JSON_DEFAULTS,
                 "customApiKeyResponses": {
                     "approved": [api_key_suffix] if api_key_suffix else [],
                     "rejected": [],
                 },
-                "officialMarketplaceAutoInstalled": True,
-                "effortCalloutDismissed": True,
-                "lspRecommendationDisabled": True,
-                "tipsHistory": {
-                    "new-user-warmup": 100,
-                    "terminal-setup": 100,
-                    "theme-command": 100,
-                    "fast-mode-2026-02-01": 100,
-                    "adaptive-thinking-2026-01-28": 100,
-                    "prompt-caching-scope-2026-01-05": 100,
-                    "plan-mode-for-complex-tasks": 100,
-                    "memory-command": 100,
-                    "todo-list": 100,
-                    "stickers-command": 100,
-                    "status-line": 100,
-                    "custom-commands": 100,
-                    "custom-agents": 100,
-                    "permissions": 100,
-                    "git-worktrees": 100,
-                },
+                **_CLAUDE_JSON_TIPS_DEFAULTS,
                 "projects": projects_config,
             },
             indent=2,
         )
     )
 
-    # Copy claude binary (downloaded automatically if missing)
+    # Install claude binary (downloaded automatically if missing)
     # Claude Code detects native install by checking if ~/.local/bin/claude exists
     local_bin = env.home / ".local" / "bin"
     local_bin.mkdir(parents=True, exist_ok=True)
-    claude_binary = _ensure_claude_binary()
-    shutil.copy(claude_binary, local_bin / "claude")
+    _link_or_copy(_ensure_claude_binary(), local_bin / "claude")
 
     # Claude settings.json
     claude_dir = env.home / ".claude"
     claude_dir.mkdir(exist_ok=True)
     settings = {
         "permissions": {"allow": allowed_tools or [], "deny": [], "ask": []},
-        "model": "claude-opus-4-6",
-        "statusLine": {
-            "type": "command",
-            "command": "wt list statusline --format=claude-code",
-        },
+        **_CLAUDE_SETTINGS_DEFAULTS,
     }
     (claude_dir / "settings.json").write_text(json.dumps(settings, indent=2))
 
 
+# Static tail of the demo Zellij config.kdl (plain KDL, no placeholders)
+_ZELLIJ_THEME_AND_KEYBINDS = """// Warm gold theme to match the demo aesthetic
+themes {
+    warm-gold {
+        fg "#1f2328"
+        bg "#FFFDF8"
+        black "#f5f0e8"
+        red "#d73a49"
+        green "#22863a"
+        yellow "#d29922"
+        blue "#0969da"
+        magenta "#8250df"
+        cyan "#1b7c83"
+        white "#57534e"
+        orange "#d97706"
+    }
+}
+
+keybinds clear-defaults=true {
+    normal {
+        bind "Ctrl Space" { SwitchToMode "tmux"; }
+    }
+    tmux {
+        bind "o" { SwitchToMode "pane"; }
+        bind "p" { SwitchToMode "pane"; }
+        bind "t" { SwitchToMode "tab"; }
+        bind "q" { Quit; }
+    }
+    tab {
+        bind "n" { NewTab; SwitchToMode "Normal"; }
+        bind "h" "Left" { GoToPreviousTab; SwitchToMode "Normal"; }
+        bind "l" "Right" { GoToNextTab; SwitchToMode "Normal"; }
+        bind "1" { GoToTab 1; SwitchToMode "Normal"; }
+        bind "2" { GoToTab 2; SwitchToMode "Normal"; }
+        bind "3" { GoToTab 3; SwitchToMode "Normal"; }
+        bind "4" { GoToTab 4; SwitchToMode "Normal"; }
+    }
+    pane {
+        bind "n" { NewPane; SwitchToMode "Normal"; }
+    }
+    shared_except "locked" {
+        bind "Ctrl t" { NewTab; }
+        bind "Ctrl n" { NewPane; }
+    }
+    shared_except "normal" {
+        bind "Ctrl Space" "Ctrl c" { SwitchToMode "normal"; }
+        bind "Esc" { SwitchToMode "normal"; }
+    }
+}
+"""
+
+
 def setup_zellij_config(env: DemoEnv, default_cwd: str = None) -> None:
     """Set up Zellij configuration for demo recording.
 
@@ -565,9 +844,8 @@ def setup_zellij_config(env: DemoEnv, default_cwd: str = None) -> None:
     zellij_plugins_dir = zellij_config_dir / "plugins"
     zellij_plugins_dir.mkdir(exist_ok=True)
 
-    # Copy Zellij plugin (downloaded automatically if missing)
-    plugin_path = _ensure_zellij_plugin()
-    shutil.copy(plugin_path, zellij_plugins_dir / "zellij-tab-name.wasm")
+    # Install Zellij plugin (downloaded automatically if missing)
+    _link_or_copy(_ensure_zellij_plugin(), zellij_plugins_dir / "zellij-tab-name.wasm")
 
     default_cwd_line = f'default_cwd "{default_cwd}"' if default_cwd else ""
 
@@ -601,55 +879,7 @@ load_plugins {{
     "file:{zellij_plugins_dir}/zellij-tab-name.wasm"
 }}
 
-// Warm gold theme to match the demo aesthetic
-themes {{
-    warm-gold {{
-        fg "#1f2328"
-        bg "#FFFDF8"
-        black "#f5f0e8"
-        red "#d73a49"
-        green "#22863a"
-        yellow "#d29922"
-        blue "#0969da"
-        magenta "#8250df"
-        cyan "#1b7c83"
-        white "#57534e"
-        orange "#d97706"
-    }}
-}}
-
-keybinds clear-defaults=true {{
-    normal {{
-        bind "Ctrl Space" {{ SwitchToMode "tmux"; }}
-    }}
-    tmux {{
-        bind "o" {{ SwitchToMode "pane"; }}
-        bind "p" {{ SwitchToMode "pane"; }}
-        bind "t" {{ SwitchToMode "tab"; }}
-        bind "q" {{ Quit; }}
-    }}
-    tab {{
-        bind "n" {{ NewTab; SwitchToMode "Normal"; }}
-        bind "h" "Left" {{ GoToPreviousTab; SwitchToMode "Normal"; }}
-        bind "l" "Right" {{ GoToNextTab; SwitchToMode "Normal"; }}
-        bind "1" {{ GoToTab 1; SwitchToMode "Normal"; }}
-        bind "2" {{ GoToTab 2; SwitchToMode "Normal"; }}
-        bind "3" {{ GoToTab 3; SwitchToMode "Normal"; }}
-        bind "4" {{ GoToTab 4; SwitchToMode "Normal"; }}
-    }}
-    pane {{
-        bind "n" {{ NewPane; SwitchToMode "Normal"; }}
-    }}
-    shared_except "locked" {{
-        bind "Ctrl t" {{ NewTab; }}
-        bind "Ctrl n" {{ NewPane; }}
-    }}
-    shared_except "normal" {{
-        bind "Ctrl Space" "Ctrl c" {{ SwitchToMode "normal"; }}
-        bind "Esc" {{ SwitchToMode "normal"; }}
-    }}
-}}
-""")
+""" + _ZELLIJ_THEME_AND_KEYBINDS)
 
 
 def setup_fish_config(env: DemoEnv, wsl_create: bool = False) -> None:
@@ -702,19 +932,10 @@ end
 """)
 
 
-def setup_mock_clis(env: DemoEnv) -> None:
-    """Set up comprehensive mock CLIs for all demo scenarios.
-
-    Creates mocks for: npm, docker, flyctl, llm, cargo.
-    Each mock handles all cases - demos just use the branches they need.
-    """
-    bin_dir = env.home / ".local" / "bin"
-    bin_dir.mkdir(parents=True, exist_ok=True)
-
+# Mock CLIs installed by setup_mock_clis: {name: script body after the shebang}
+_MOCK_CLIS = {
     # npm mock - handles install, build, dev (with optional port)
-    npm_mock = bin_dir / "npm"
-    npm_mock.write_text("""#!/bin/bash
-if [[ "$1" == "install" ]]; then
+    "npm": """if [[ "$1" == "install" ]]; then
     echo "added 847 packages in 3.2s"
 elif [[ "$1" == "run" && "$2" == "build" ]]; then
     echo "vite v5.4.2 building for production..."
@@ -735,35 +956,23 @@ elif [[ "$1" == "run" && "$2" == "dev" ]]; then
     echo "  ➜  Local:   http://localhost:$port/"
     echo "  ➜  Network: http://192.168.1.42:$port/"
 fi
-""")
-    npm_mock.chmod(0o755)
-
+""",
     # docker mock - handles compose up
-    docker_mock = bin_dir / "docker"
-    docker_mock.write_text("""#!/bin/bash
-if [[ "$1" == "compose" && "$2" == "up" ]]; then
+    "docker": """if [[ "$1" == "compose" && "$2" == "up" ]]; then
     echo "[+] Running 1/1"
     echo " ✔ Container postgres  Started"
 fi
-""")
-    docker_mock.chmod(0o755)
-
+""",
     # flyctl mock - handles scale
-    flyctl_mock = bin_dir / "flyctl"
-    flyctl_mock.write_text("""#!/bin/bash
-if [[ "$1" == "scale" ]]; then
+    "flyctl": """if [[ "$1" == "scale" ]]; then
     echo "Scaling app to 0 machines"
 fi
-""")
-    flyctl_mock.chmod(0o755)
-
+""",
     # llm mock - simulates both commit message and summary generation.
     # Reads stdin to detect prompt type: summary prompts contain "summary",
     # commit prompts don't. For summaries, returns branch-appropriate one-liners
     # based on filenames in the diff.
-    llm_mock = bin_dir / "llm"
-    llm_mock.write_text(r"""#!/bin/bash
-input=$(cat)
+    "llm": r"""input=$(cat)
 
 if echo "$input" | grep -qi "summary"; then
     # Summary generation — return branch-appropriate one-liner
@@ -785,13 +994,9 @@ else
     echo ""
     echo "Add placeholder module for user profile settings."
 fi
-""")
-    llm_mock.chmod(0o755)
-
+""",
     # cargo mock - handles nextest run
-    cargo_mock = bin_dir / "cargo"
-    cargo_mock.write_text(r"""#!/bin/bash
-if [[ "$1" == "nextest" && "$2" == "run" ]]; then
+    "cargo": r"""if [[ "$1" == "nextest" && "$2" == "run" ]]; then
     sleep 0.3
     echo "    Finished \`test\` profile [unoptimized + debuginfo] target(s) in 0.02s"
     echo "    Starting 2 tests across 1 binary"
@@ -800,8 +1005,24 @@ if [[ "$1" == "nextest" && "$2" == "run" ]]; then
     echo "------------"
     echo "     Summary [   0.002s] 2 tests run: 2 passed, 0 skipped"
 fi
-""")
-    cargo_mock.chmod(0o755)
+""",
+}
+_MOCK_CLI_SCRIPTS = {
+    name: f"#!/bin/bash\n{body}".encode() for name, body in _MOCK_CLIS.items()
+}
+
+
+def setup_mock_clis(env: DemoEnv) -> None:
+    """Set up comprehensive mock CLIs for all demo scenarios.
+
+    Creates mocks for: npm, docker, flyctl, llm, cargo.
+    Each mock handles all cases - demos just use the branches they need.
+    """
+    bin_dir = env.home / ".local" / "bin"
+    bin_dir.mkdir(parents=True, exist_ok=True)
+
+    for name, script in _MOCK_CLI_SCRIPTS.items():
+        _write_executable(bin_dir / name, script)
 
 
 def prepare_demo_repo(env: DemoEnv, repo_root: Path, hooks_config: str = None):
@@ -834,51 +1055,81 @@ def prepare_demo_repo(env: DemoEnv, repo_root: Path, hooks_config: str = None):
     # Project hooks
     if hooks_config is None:
         hooks_config = '[pre-merge]\ntest = "cargo nextest run"\n'
+    claude_md = "# Acme App\n\nRust project. Run `cargo test` for tests.\n"
     (env.repo / ".config" / "wt.toml").write_text(hooks_config)
     claude_md_dir = env.repo / ".claude"
     claude_md_dir.mkdir(exist_ok=True)
-    (claude_md_dir / "CLAUDE.md").write_text("# Acme App\n\nRust project. Run `cargo test` for tests.\n")
-    git(["-C", str(env.repo), "add", ".config/wt.toml", ".claude/CLAUDE.md"])
-    commit_dated(env.repo, "Add project hooks", "5d")
-    git(["-C", str(env.repo), "push", "-q"])
+    (claude_md_dir / "CLAUDE.md").write_text(claude_md)
+    _fast_import(
+        env.repo,
+        "main",
+        [
+            (
+                "Add project hooks",
+                "5d",
+                {".config/wt.toml": hooks_config, ".claude/CLAUDE.md": claude_md},
+            )
+        ],
+        now=env.date_baseline,
+        parent="main",
+    )
 
-    # Mock gh CLI with varied CI status per branch
-    bin_dir = env.home / ".local" / "bin"
-    gh_mock = bin_dir / "gh"
-    shutil.copy(FIXTURES_DIR / "gh-mock.sh", gh_mock)
+    # Mock gh CLI with varied CI status per branch (copied, not linked, so
+    # nothing in the demo home can change the tracked fixture)
+    gh_mock = env.home / ".local" / "bin" / "gh"
+    shutil.copy2(FIXTURES_DIR / "gh-mock.sh", gh_mock)
     gh_mock.chmod(0o755)
 
     # Extra branches without worktrees (for --branches view)
-    git(["-C", str(env.repo), "branch", "docs/readme"])
-    git(["-C", str(env.repo), "branch", "spike/search"])
+    git_batch(env.repo, [["branch", "docs/readme"], ["branch", "spike/search"]])
 
     # Create beta first (from current main, so it will be behind after main commit)
     _create_branch_beta(env)
 
     # Commit to main so beta is behind
     readme = env.repo / "README.md"
-    readme.write_text(
+    readme_content = (
         readme.read_text() + "\n## Development\n\nSee CONTRIBUTING.md for guidelines.\n"
     )
+    readme.write_text(readme_content)
     (env.repo / "notes.md").write_text("# Notes\n")
-    git(["-C", str(env.repo), "add", "README.md", "notes.md"])
-    commit_dated(env.repo, "docs: add development section", "1d")
-    git(["-C", str(env.repo), "push", "-q"])
+    _fast_import(
+        env.repo,
+        "main",
+        [
+            (
+                "docs: add development section",
+                "1d",
+                {"README.md": readme_content, "notes.md": "# Notes\n"},
+            )
+        ],
+        now=env.date_baseline,
+        parent="main",
+    )
 
     # Create alpha and hooks after the main commit (so they're only ahead, not diverged)
-    _create_branch_alpha(env)
+    alpha_readme = _create_branch_alpha(env)
     _create_branch_hooks(env)
 
+    # Sync main's index with the imported commits (not -q: the quiet form
+    # skips the index refresh), publish everything in one push (hooks has no
+    # remote), then give alpha its unpushed commit
+    git_batch(
+        env.repo,
+        [["reset"], ["push", "-q", "-u", "origin", "main", "beta", "alpha"]],
+    )
+    _add_alpha_local_changes(env, alpha_readme)
 
-def _create_branch_alpha(env: DemoEnv):
-    """Create alpha branch with large diff and unpushed commits."""
-    branch = "alpha"
-    path = env.work_base / f"acme.{branch}"
 
-    git(["-C", str(env.repo), "checkout", "-q", "-b", branch, "main"])
+def _create_branch_alpha(env: DemoEnv) -> str:
+    """Create alpha branch's published history (pushed by prepare_demo_repo).
+
+    Returns alpha's README, which _add_alpha_local_changes builds on.
+    """
+    branch = "alpha"
 
-    # Initial README changes
-    (env.repo / "README.md").write_text("""# Acme App
+    # README changes, then a utils module with substantial content
+    readme = """# Acme App
 
 A demo application for showcasing worktrunk features.
 
@@ -892,38 +1143,46 @@ A demo application for showcasing worktrunk features.
 ## Getting Started
 
 Run `wt list` to see all worktrees.
-""")
-    git(["-C", str(env.repo), "add", "README.md"])
-    commit_dated(env.repo, "docs: expand README", "3d")
+"""
+    readme_contributing = readme + "\n## Contributing\n\nPRs welcome!\n"
+    readme_license = readme_contributing + "\n## License\n\nMIT\n"
+    lib_rs = "pub mod utils;\n\n" + (env.repo / "src" / "lib.rs").read_text()
+    _fast_import(
+        env.repo,
+        branch,
+        [
+            ("docs: expand README", "3d", {"README.md": readme}),
+            ("docs: add contributing section", "3d", {"README.md": readme_contributing}),
+            ("docs: add license", "3d", {"README.md": readme_license}),
+            (
+                "feat: add utility functions module",
+                "3d",
+                {
+                    "src/utils.rs": (FIXTURES_DIR / "alpha-utils.rs").read_text(),
+                    "src/lib.rs": lib_rs,
+                },
+            ),
+        ],
+        now=env.date_baseline,
+        parent="main",
+    )
+    return readme_license
 
-    # More commits
-    readme = env.repo / "README.md"
-    readme.write_text(readme.read_text() + "\n## Contributing\n\nPRs welcome!\n")
-    git(["-C", str(env.repo), "add", "README.md"])
-    commit_dated(env.repo, "docs: add contributing section", "3d")
-
-    readme.write_text(readme.read_text() + "\n## License\n\nMIT\n")
-    git(["-C", str(env.repo), "add", "README.md"])
-    commit_dated(env.repo, "docs: add license", "3d")
-
-    # Add utils module with substantial content
-    shutil.copy(FIXTURES_DIR / "alpha-utils.rs", env.repo / "src" / "utils.rs")
-    # Update lib.rs to include the module
-    lib_rs = env.repo / "src" / "lib.rs"
-    lib_content = lib_rs.read_text()
-    lib_rs.write_text("pub mod utils;\n\n" + lib_content)
-    git(["-C", str(env.repo), "add", "src/utils.rs", "src/lib.rs"])
-    commit_dated(env.repo, "feat: add utility functions module", "3d")
-
-    git(["-C", str(env.repo), "push", "-u", "origin", branch, "-q"])
-    git(["-C", str(env.repo), "checkout", "-q", "main"])
-    git(["-C", str(env.repo), "worktree", "add", "-q", str(path), branch])
+
+def _add_alpha_local_changes(env: DemoEnv, readme: str):
+    """Give alpha an unpushed commit and a worktree with a large diff."""
+    branch = "alpha"
+    path = env.work_base / f"acme.{branch}"
 
     # Unpushed commit
-    readme = path / "README.md"
-    readme.write_text(readme.read_text() + "## FAQ\n\n")
-    git(["-C", str(path), "add", "README.md"])
-    commit_dated(path, "docs: add FAQ section", "3d")
+    _fast_import(
+        env.repo,
+        branch,
+        [("docs: add FAQ section", "3d", {"README.md": readme + "## FAQ\n\n"})],
+        now=env.date_baseline,
+        parent=branch,
+    )
+    git(["-C", str(env.repo), "worktree", "add", "-q", str(path), branch])
 
     # Working tree changes - large diff using shared fixture
     shutil.copy(FIXTURES_DIR / "alpha-readme.md", path / "README.md")
@@ -935,10 +1194,11 @@ def _create_branch_beta(env: DemoEnv):
     branch = "beta"
     path = env.work_base / f"acme.{branch}"
 
-    git(["-C", str(env.repo), "checkout", "-q", "-b", branch, "main"])
-    git(["-C", str(env.repo), "push", "-u", "origin", branch, "-q"])
-    git(["-C", str(env.repo), "checkout", "-q", "main"])
-    git(["-C", str(env.repo), "worktree", "add", "-q", str(path), branch])
+    # Pushed (with upstream) by prepare_demo_repo
+    git_batch(
+        env.repo,
+        [["branch", branch, "main"], ["worktree", "add", "-q", str(path), branch]],
+    )
 
     # Staged new file
     (path / "notes.txt").write_text("# TODO\n- Add caching\n")
@@ -950,20 +1210,23 @@ def _create_branch_hooks(env: DemoEnv):
     branch = "hooks"
     path = env.work_base / f"acme.{branch}"
 
-    git(["-C", str(env.repo), "checkout", "-q", "-b", branch, "main"])
-    shutil.copy(FIXTURES_DIR / "lib-hooks.rs", env.repo / "src" / "lib.rs")
-    git(["-C", str(env.repo), "add", "src/lib.rs"])
-    commit_dated(env.repo, "feat: add math operations, consolidate tests", "2H")
-
     # No push - no upstream
-    git(["-C", str(env.repo), "checkout", "-q", "main"])
+    lib_rs_content = (FIXTURES_DIR / "lib-hooks.rs").read_text()
+    _fast_import(
+        env.repo,
+        branch,
+        [("feat: add math operations, consolidate tests", "2H", {"src/lib.rs": lib_rs_content})],
+        now=env.date_baseline,
+        parent="main",
+    )
     git(["-C", str(env.repo), "worktree", "add", "-q", str(path), branch])
 
-    # Staged then modified
+    # Staged then modified (the worktree checkout matches the fixture)
     lib_rs = path / "src" / "lib.rs"
-    lib_rs.write_text(lib_rs.read_text() + "// Division coming soon\n")
+    lib_rs_content += "// Division coming soon\n"
+    lib_rs.write_text(lib_rs_content)
     git(["-C", str(path), "add", "src/lib.rs"])
-    lib_rs.write_text(lib_rs.read_text() + "// TODO: add division\n")
+    lib_rs.write_text(lib_rs_content + "// TODO: add division\n")
 
 
 # =============================================================================
@@ -971,16 +1234,22 @@ def _create_branch_hooks(env: DemoEnv):
 # =============================================================================
 
 
+@functools.lru_cache(maxsize=None)
+def _which(cmd: str) -> str | None:
+    """shutil.which, cached: PATH doesn't change during a build."""
+    return shutil.which(cmd)
+
+
 def check_dependencies(commands: list[str]):
     """Check that required commands are available, exit if not."""
     for cmd in commands:
-        if not shutil.which(cmd):
+        if not _which(cmd):
             raise SystemExit(f"Missing dependency: {cmd}")
 
 
 def check_ffmpeg_libass():
     """Check that ffmpeg has libass support (required for keystroke overlay)."""
-    if not shutil.which("ffmpeg"):
+    if not _which("ffmpeg"):
         raise SystemExit(
             "Missing dependency: ffmpeg\n"
             "Install with: HOMEBREW_NO_INSTALL_FROM_API=1 brew install --build-from-source ffmpeg"
@@ -1008,6 +1277,28 @@ def setup_demo_output(out_dir: Path) -> Path:
     return starship_config
 
 
+# Tape lines record_text rewrites for text output: the Output target, the
+# canvas size, and GIF-only settings (dropped along with their newline)
+_TEXT_REWRITE_RE = re.compile(
+    r'^(?:(?P<output>Output\s+"[^"]+")'
+    r"|Set (?P<size>Width|Height) .*$"
+    r"|Set (?:FontSize|Theme|Padding) .*$\n?)",
+    re.MULTILINE,
+)
+
+# Tape lines that matter to extract_commands_from_tape: a Show/Hide marker, or
+# a Type "command" line, with `enter` set when an Enter follows (possibly after
+# blank and Sleep lines)
+_TAPE_COMMAND_RE = re.compile(
+    r"^[ \t]*(?:"
+    r"(?P<visibility>Show|Hide)[ \t]*$"
+    r"|Type[ \t]+[\"'](?P<cmd>.+)[\"'][^\n]*"
+    r"(?P<enter>(?:\n[ \t]*(?:Sleep [^\n]*)?)*\n[ \t]*Enter[ \t]*$)?"
+    r")",
+    re.MULTILINE,
+)
+
+
 def record_text(
     demo_env: DemoEnv,
     tape_path: Path,
@@ -1040,20 +1331,20 @@ def record_text(
         raise RuntimeError(f"Failed to render tape: {tape_path}")
 
     # Modify for text output
-    temp_txt = (demo_env.out_dir / ".text-output.txt").resolve()
-    rendered = re.sub(
-        r'^Output\s+"[^"]+"', f'Output "{temp_txt}"', rendered, flags=re.MULTILINE
-    )
-    rendered = re.sub(r"^Set Width .*$", "Set Width 120", rendered, flags=re.MULTILINE)
-    rendered = re.sub(
-        r"^Set Height .*$", "Set Height 120", rendered, flags=re.MULTILINE
-    )
-    for setting in ["FontSize", "Theme", "Padding"]:
-        rendered = re.sub(rf"^Set {setting} .*$\n?", "", rendered, flags=re.MULTILINE)
+    temp_txt = demo_env.out_dir_resolved / ".text-output.txt"
+
+    def rewrite(match):
+        if match["output"]:
+            return f'Output "{temp_txt}"'
+        if match["size"]:
+            return f"Set {match['size']} 120"
+        return ""
+
+    rendered = _TEXT_REWRITE_RE.sub(rewrite, rendered)
 
     # Write and run
-    tape_rendered = (demo_env.out_dir / ".text-rendered.tape").resolve()
-    tape_rendered.write_text(rendered)
+    tape_rendered = demo_env.out_dir_resolved / ".text-rendered.tape"
+    tape_rendered.write_bytes(rendered.encode())
     try:
         run([vhs_binary, str(tape_rendered)], check=True)
     finally:
@@ -1061,8 +1352,8 @@ def record_text(
 
     if not temp_txt.exists():
         raise RuntimeError(f"VHS succeeded but output file not created: {temp_txt}")
-    shutil.copy(temp_txt, output_txt)
-    temp_txt.unlink()
+    # Rename when out_dir and output_txt share a filesystem, copy otherwise
+    shutil.move(temp_txt, output_txt)
 
 
 def extract_commands_from_tape(
@@ -1089,42 +1380,24 @@ def extract_commands_from_tape(
     if not rendered:
         return []
 
+    # Nothing before the first Show is visible, so a cheap substring search
+    # lets the regex skip the hidden setup prologue (or the whole tape)
+    first_show = rendered.find("Show")
+    if first_show == -1:
+        return []
+    scan_from = rendered.rfind("\n", 0, first_show) + 1
+
     commands = []
     in_visible_section = False
-    lines = rendered.split("\n")
-    i = 0
-
-    while i < len(lines):
-        line = lines[i].strip()
-
+    for match in _TAPE_COMMAND_RE.finditer(rendered, scan_from):
         # Track visibility
-        if line == "Show":
-            in_visible_section = True
-        elif line == "Hide":
-            in_visible_section = False
-
-        # Look for Type "command" pattern
-        if in_visible_section and line.startswith("Type "):
-            # Extract command from Type "..." or Type '...'
-            match = re.match(r'Type\s+["\'](.+)["\']', line)
-            if match:
-                cmd = match.group(1)
-                # Check if Enter follows (possibly with Sleep in between)
-                j = i + 1
-                while j < len(lines):
-                    next_line = lines[j].strip()
-                    if not next_line:
-                        j += 1
-                        continue
-                    if next_line.startswith("Sleep "):
-                        j += 1
-                        continue
-                    if next_line == "Enter":
-                        # Only include commands with specified prefixes
-                        if any(cmd.startswith(prefix) for prefix in command_prefixes):
-                            commands.append(cmd)
-                    break
-        i += 1
+        if match["visibility"]:
+            in_visible_section = match["visibility"] == "Show"
+        # Type "command" followed by Enter, with specified prefixes
+        elif in_visible_section and match["enter"]:
+            cmd = match["cmd"]
+            if cmd.startswith(command_prefixes):
+                commands.append(cmd)
 
     return commands
 
@@ -1165,45 +1438,37 @@ def record_snapshot(
         raise RuntimeError(f"No snapshotable commands found in {tape_path.name}")
 
     # Build environment matching the GIF demos
-    env = os.environ.copy()
-    env.update(
-        {
-            "HOME": str(demo_env.home),
-            "XDG_CONFIG_HOME": str(demo_env.home / ".config"),
-            "PATH": f"{repo_root / 'target' / 'debug'}:{demo_env.home / '.local' / 'bin'}:{os.environ.get('PATH', '')}",
-            "TERM": "xterm-256color",
-            "LANG": "en_US.UTF-8",
-            "LC_ALL": "en_US.UTF-8",
-            "GIT_PAGER": "",  # Plain text output, no delta formatting
-        }
-    )
+    env = {
+        **os.environ,
+        "HOME": str(demo_env.home),
+        "XDG_CONFIG_HOME": str(demo_env.home / ".config"),
+        "PATH": f"{repo_root / 'target' / 'debug'}:{demo_env.home / '.local' / 'bin'}:{os.environ.get('PATH', '')}",
+        "TERM": "xterm-256color",
+        "LANG": "en_US.UTF-8",
+        "LC_ALL": "en_US.UTF-8",
+        "GIT_PAGER": "",  # Plain text output, no delta formatting
+    }
 
     # Generate a fish script that:
     # 1. Initializes shell integration (like shared-commands.tape)
     # 2. Runs each command, printing "$ cmd" before and blank line after
-    script_lines = [
-        "# Initialize shell integration",
-        "wt config shell init fish | source",
-        "source ~/.config/fish/completions/wt.fish",
-        f"cd {demo_env.repo}",
-        "",
-    ]
-
-    for i, cmd in enumerate(commands):
-        # Echo the command prompt, run command (merging stderr)
-        script_lines.append(f"echo '$ {cmd}'")
-        script_lines.append(f"{cmd} 2>&1")
-        # Blank line between commands (not after last)
-        if i < len(commands) - 1:
-            script_lines.append("echo ''")
-
-    script_content = "\n".join(script_lines)
-    script_path = demo_env.out_dir / ".snapshot-script.fish"
-    script_path.write_text(script_content)
+    script_content = "\n".join(
+        [
+            # Completions aren't sourced: nothing is tab-completed here
+            "# Initialize shell integration",
+            "wt config shell init fish | source",
+            f"cd {demo_env.repo}",
+            "",
+            # Echo the command prompt, run command (merging stderr), with a
+            # blank line between commands (not after last)
+            "\necho ''\n".join(f"echo '$ {cmd}'\n{cmd} 2>&1" for cmd in commands),
+        ]
+    )
 
-    # Run the script in fish
+    # Pass the script to fish as an argument rather than via a file or stdin,
+    # so commands still inherit our stdin instead of reading the script
     result = subprocess.run(
-        ["fish", str(script_path)],
+        ["fish", "-c", script_content],
         env=env,
         capture_output=True,
         text=True,
@@ -1214,9 +1479,10 @@ def record_snapshot(
 
     # Normalize temp paths to stable placeholder
     temp_path = str(demo_env.out_dir)
-    temp_path_real = str(demo_env.out_dir.resolve())
+    temp_path_real = str(demo_env.out_dir_resolved)
     output = output.replace(temp_path_real, "<DEMO_DIR>")
-    output = output.replace(temp_path, "<DEMO_DIR>")
+    if temp_path != temp_path_real:
+        output = output.replace(temp_path, "<DEMO_DIR>")
 
     # Write snapshot
     output_snap.parent.mkdir(parents=True, exist_ok=True)
@@ -1247,11 +1513,11 @@ def build_tape_replacements(demo_env: DemoEnv, repo_root: Path) -> dict:
     - Source shared-setup.tape: VHS Set directives (at top, before Output)
     - Source shared-commands.tape: Env vars and shell setup (after Require)
     """
-    starship_config = (demo_env.out_dir / "starship.toml").resolve()
+    starship_config = demo_env.out_dir_resolved / "starship.toml"
 
     return {
-        "DEMO_REPO": demo_env.repo.resolve(),
-        "DEMO_HOME": demo_env.home.resolve(),
+        "DEMO_REPO": demo_env.repo_resolved,
+        "DEMO_HOME": demo_env.home_resolved,
         "REAL_HOME": REAL_HOME,
         "STARSHIP_CONFIG": starship_config,
         "TARGET_DEBUG": (repo_root / "target" / "debug").resolve(),
@@ -1267,6 +1533,7 @@ def record_all_themes(
     repo_root: Path,
     vhs_binary: str = "vhs",
     size: DemoSize = None,
+    base_replacements: dict = None,
 ):
     """Record demo GIFs for all themes.
 
@@ -1277,12 +1544,15 @@ def record_all_themes(
         repo_root: Path to worktrunk repo root (for target/debug)
         vhs_binary: VHS binary to use (default "vhs", can be path to custom build)
         size: Canvas and font size (default SIZE_DOCS)
+        base_replacements: Result of build_tape_replacements, if the caller
+            already built it (built here otherwise)
     """
     if size is None:
         size = SIZE_DOCS
+    if base_replacements is None:
+        base_replacements = build_tape_replacements(demo_env, repo_root)
 
     tape_rendered = demo_env.out_dir / ".rendered.tape"
-    base_replacements = build_tape_replacements(demo_env, repo_root)
 
     for theme_name, output_gif in output_gifs.items():
         theme = THEMES[theme_name]
@@ -1303,7 +1573,7 @@ def record_all_themes(
         if not rendered:
             continue
 
-        tape_rendered.write_text(rendered)
+        tape_rendered.write_bytes(rendered.encode())
         print(f"\nRecording {theme_name} GIF...")
         record_vhs(tape_rendered, vhs_binary, expected_output=output_gif)
         tape_rendered.unlink(missing_ok=True)
@@ -22,10 +22,15 @@ Usage:
 
 from __future__ import annotations
 
+import functools
+import shutil
+import struct
 import subprocess
-import tempfile
+from collections.abc import Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
+from typing import IO
 
 
 @dataclass
@@ -38,6 +43,25 @@ class Checkpoint:
     forbidden: list[str] = field(default_factory=list)
     step: int = 10
 
+    @property
+    def frames(self) -> list[int]:
+        """Frame numbers sampled within the range."""
+        return list(range(self.start, self.end + 1, self.step))
+
+    @property
+    def label(self) -> str:
+        return f"frames {self.start}-{self.end}"
+
+    @functools.cached_property
+    def expected_lower(self) -> list[tuple[str, str]]:
+        """(pattern, lowercased pattern) pairs, lowercased once per checkpoint."""
+        return [(pattern, pattern.lower()) for pattern in self.expected]
+
+    @functools.cached_property
+    def forbidden_lower(self) -> list[tuple[str, str]]:
+        """(pattern, lowercased pattern) pairs, lowercased once per checkpoint."""
+        return [(pattern, pattern.lower()) for pattern in self.forbidden]
+
 
 # Checkpoint definitions per TUI demo.
 # Ranges are calibrated from actual GIF content at 30fps.
@@ -69,137 +93,193 @@ TUI_CHECKPOINTS: dict[str, list[Checkpoint]] = {
 }
 
 
+@functools.lru_cache(maxsize=1)
+def _missing_tools() -> tuple[str, ...]:
+    return tuple(cmd for cmd in ("ffmpeg", "tesseract") if shutil.which(cmd) is None)
+
+
 def check_dependencies() -> list[str]:
     """Check that required tools are available. Returns list of missing tools."""
-    missing = []
-    for cmd in ["ffmpeg", "tesseract"]:
-        result = subprocess.run(
-            ["which", cmd], capture_output=True, text=True
-        )
-        if result.returncode != 0:
-            missing.append(cmd)
-    return missing
-
-
-def extract_frames(
-    gif_path: Path, frames: list[int], out_dir: Path
-) -> dict[int, Path]:
+    return list(_missing_tools())
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _read_png(stream: IO[bytes]) -> bytes | None:
+    """Read the next image from a stream of concatenated PNGs (ffmpeg's image2pipe).
+
+    Returns None at end of stream or if the stream is truncated.
+    """
+    signature = stream.read(len(_PNG_SIGNATURE))
+    if signature != _PNG_SIGNATURE:
+        return None
+    parts = [signature]
+    chunk_type = None
+    # Read the chunks (length, type, data, CRC) up to and including IEND
+    while chunk_type != b"IEND":
+        header = stream.read(8)
+        if len(header) < 8:
+            return None
+        length, chunk_type = struct.unpack(">I4s", header)
+        body = stream.read(length + 4)
+        if len(body) < length + 4:
+            return None
+        parts += (header, body)
+    return b"".join(parts)
+
+
+def iter_frames(gif_path: Path, frames: list[int]) -> Iterator[tuple[int, bytes]]:
     """Extract multiple frames from a GIF in a single ffmpeg pass.
 
-    Returns a mapping from frame number to extracted PNG path.
+    Frames are piped back as PNG data rather than written to disk, and each
+    is yielded as soon as ffmpeg emits it. `frames` must be in ascending
+    order; frames past the end of the GIF are simply not yielded.
+
+    Yields (frame number, PNG bytes).
     """
     if not frames:
-        return {}
+        return
 
     # Build select filter: select='eq(n,150)+eq(n,160)+eq(n,170)+...'
     select_expr = "+".join(f"eq(n\\,{f})" for f in frames)
-    pattern = str(out_dir / "frame_%04d.png")
 
-    result = subprocess.run(
+    with subprocess.Popen(
         [
             "ffmpeg",
             "-loglevel", "error",
             "-i", str(gif_path),
             "-vf", f"select='{select_expr}'",
             "-vsync", "vfr",
-            str(pattern),
+            "-f", "image2pipe",
+            "-c:v", "png",
+            "-",
         ],
-        capture_output=True,
-    )
-    if result.returncode != 0:
-        return {}
-
-    # ffmpeg numbers output files sequentially (frame_0001.png, frame_0002.png, ...)
-    return {
-        frame: out_dir / f"frame_{i + 1:04d}.png"
-        for i, frame in enumerate(frames)
-        if (out_dir / f"frame_{i + 1:04d}.png").exists()
-    }
-
-
-def ocr_image(image_path: Path) -> str:
-    """Run OCR on an image and return the extracted text."""
-    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as f:
-        output_base = f.name[:-4]  # Remove .txt suffix for tesseract
-
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    ) as proc:
+        try:
+            # ffmpeg emits the selected frames in order
+            for frame in frames:
+                png = _read_png(proc.stdout)
+                if png is None:
+                    break
+                yield frame, png
+        finally:
+            # Don't let ffmpeg decode the rest of the GIF once the last
+            # requested frame has been read
+            proc.kill()
+
+
+@functools.lru_cache(maxsize=64)
+def ocr_image(png: bytes) -> str:
+    """Run OCR on a PNG image and return the extracted text.
+
+    Cached by image content: while a TUI screen is static, consecutive
+    sampled frames encode to identical PNGs and only need OCR once.
+    """
+    # --psm 6: a terminal screen is one uniform block of text, so skip
+    # tesseract's page layout analysis
     result = subprocess.run(
-        ["tesseract", str(image_path), output_base, "-l", "eng"],
+        ["tesseract", "stdin", "stdout", "-l", "eng", "--psm", "6"],
+        input=png,
         capture_output=True,
     )
-
-    output_path = Path(f"{output_base}.txt")
-    if result.returncode == 0 and output_path.exists():
-        text = output_path.read_text()
-        output_path.unlink()
-        return text
+    if result.returncode == 0:
+        return result.stdout.decode(errors="replace")
     return ""
 
 
-def _check_patterns(
-    text: str,
-    expected: list[str],
-    forbidden: list[str],
-) -> tuple[bool, list[str]]:
-    """Check text against expected/forbidden patterns.
+def _check_patterns(text: str, checkpoint: Checkpoint) -> tuple[bool, list[str]]:
+    """Check text against a checkpoint's expected/forbidden patterns.
 
     Returns (passed, errors).
     """
     text_lower = text.lower()
     errors = []
 
-    for pattern in expected:
-        if pattern.lower() not in text_lower:
+    for pattern, lowered in checkpoint.expected_lower:
+        if lowered not in text_lower:
             errors.append(f"'{pattern}' not found")
 
-    for pattern in forbidden:
-        if pattern.lower() in text_lower:
+    for pattern, lowered in checkpoint.forbidden_lower:
+        if lowered in text_lower:
             errors.append(f"forbidden '{pattern}' present")
 
     return len(errors) == 0, errors
 
 
 def validate_checkpoint(
-    gif_path: Path,
     checkpoint: Checkpoint,
-    work_dir: Path,
+    frame_images: Mapping[int, Future[bytes | None]],
 ) -> tuple[bool, str]:
     """Validate a checkpoint by scanning its frame range.
 
-    Extracts all sampled frames in one ffmpeg call, then OCRs each
-    sequentially until one matches (early return on success).
+    OCRs the checkpoint's frames sequentially as they are extracted, until
+    one matches (early return on success). A frame whose future resolves to
+    None could not be extracted and is skipped.
 
     Returns (passed, detail_message).
     """
-    frame_numbers = list(range(checkpoint.start, checkpoint.end + 1, checkpoint.step))
-    frame_paths = extract_frames(gif_path, frame_numbers, work_dir)
-
-    if not frame_paths:
-        label = f"frames {checkpoint.start}-{checkpoint.end}"
-        return False, f"failed to extract {label}"
-
     best_errors: list[str] = []
     frames_checked = 0
 
-    for frame in frame_numbers:
-        frame_path = frame_paths.get(frame)
-        if frame_path is None:
+    for frame in checkpoint.frames:
+        png = frame_images[frame].result()
+        if png is None:
             continue
 
         frames_checked += 1
-        text = ocr_image(frame_path)
+        text = ocr_image(png)
         if not text:
             continue
 
-        passed, errors = _check_patterns(text, checkpoint.expected, checkpoint.forbidden)
+        passed, errors = _check_patterns(text, checkpoint)
         if passed:
             return True, f"matched at frame {frame} ({frames_checked} checked)"
         if not best_errors or len(errors) < len(best_errors):
             best_errors = errors
 
-    label = f"frames {checkpoint.start}-{checkpoint.end}"
     if not frames_checked:
-        return False, f"no readable frames in {label}"
-    return False, f"no match in {label} ({frames_checked} checked): {'; '.join(best_errors)}"
+        return False, f"failed to extract {checkpoint.label}"
+
+    return False, (
+        f"no match in {checkpoint.label} ({frames_checked} checked): {'; '.join(best_errors)}"
+    )
+
+
+def _validate_checkpoints(
+    gif_path: Path, checkpoints: list[Checkpoint]
+) -> list[tuple[Checkpoint, bool, str]]:
+    """Validate all checkpoints of a GIF, decoding it once.
+
+    The sampled frames of every checkpoint are extracted in a single ffmpeg
+    pass, so the GIF is decoded once rather than once per checkpoint. Frames
+    are handed over as ffmpeg emits them, so the checkpoints are OCR'd
+    concurrently with each other and with the rest of the decode (each
+    still stops at its first matching frame).
+
+    Returns (checkpoint, passed, detail_message) per checkpoint, in order.
+    """
+    frames = sorted({frame for checkpoint in checkpoints for frame in checkpoint.frames})
+    frame_images: dict[int, Future[bytes | None]] = {frame: Future() for frame in frames}
+
+    def extract():
+        try:
+            for frame, png in iter_frames(gif_path, frames):
+                frame_images[frame].set_result(png)
+        finally:
+            # Release any checkpoint still waiting on a frame that never came
+            for future in frame_images.values():
+                if not future.done():
+                    future.set_result(None)
+
+    def validate(checkpoint):
+        return (checkpoint, *validate_checkpoint(checkpoint, frame_images))
+
+    with ThreadPoolExecutor(max_workers=len(checkpoints) + 1) as executor:
+        executor.submit(extract)
+        return list(executor.map(validate, checkpoints))
 
 
 def validate_tui_demo(demo_name: str, gif_path: Path) -> list[str]:
@@ -217,18 +297,8 @@ def validate_tui_demo(demo_name: str, gif_path: Path) -> list[str]:
     if missing:
         return [f"Missing required tools: {', '.join(missing)}"]
 
-    checkpoints = TUI_CHECKPOINTS[demo_name]
-    all_errors = []
-
-    with tempfile.TemporaryDirectory(prefix="wt-validate-") as work_dir:
-        work_path = Path(work_dir)
-
-        for checkpoint in checkpoints:
-            passed, detail = validate_checkpoint(gif_path, checkpoint, work_path)
-            if not passed:
-                all_errors.append(detail)
-
-    return all_errors
+    results = _validate_checkpoints(gif_path, TUI_CHECKPOINTS[demo_name])
+    return [detail for _, passed, detail in results if not passed]
 
 
 def validate_tui_demo_verbose(demo_name: str, gif_path: Path) -> tuple[bool, str]:
@@ -248,20 +318,16 @@ def validate_tui_demo_verbose(demo_name: str, gif_path: Path) -> tuple[bool, str
     if missing:
         return False, f"Missing required tools: {', '.join(missing)}"
 
-    checkpoints = TUI_CHECKPOINTS[demo_name]
     all_passed = True
 
-    with tempfile.TemporaryDirectory(prefix="wt-validate-") as work_dir:
-        work_path = Path(work_dir)
-
-        for checkpoint in checkpoints:
-            passed, detail = validate_checkpoint(gif_path, checkpoint, work_path)
-            label = f"frames {checkpoint.start}-{checkpoint.end}"
-            if passed:
-                lines.append(f"  ✓ {label}: {detail}")
-            else:
-                lines.append(f"  ✗ {label}: {detail}")
-                all_passed = False
+    for checkpoint, passed, detail in _validate_checkpoints(
+        gif_path, TUI_CHECKPOINTS[demo_name]
+    ):
+        if passed:
+            lines.append(f"  ✓ {checkpoint.label}: {detail}")
+        else:
+            lines.append(f"  ✗ {checkpoint.label}: {detail}")
+            all_passed = False
 
     if all_passed:
         lines.append("✓ All checkpoints passed")